@@ -89,6 +89,12 @@ The five lines' completion strings have total scores as follows:
 Autocomplete tools are an odd bunch: the winner is found by sorting all of the scores and then taking the middle score. (There will always be an odd number of scores to consider.) In this example, the middle score is 288957 because there are the same number of scores smaller and larger than it.
 Find the completion string for each incomplete line, score the completion strings, and sort the scores. What is the middle score?
 """
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+
 OPEN_TO_CLOSE = {
     '{': '}',
     '[': ']',
@@ -96,7 +102,19 @@ OPEN_TO_CLOSE = {
     '<': '>'
 }
 
+CORRUPTED_POINTS = {
+    '}': 1197,
+    ']': 57,
+    ')': 3,
+    '>': 25137
+}
 
+COMPLETION_POINTS = {
+    '}': 3,
+    ']': 2,
+    ')': 1,
+    '>': 4
+}
 
 
 def check_line(line: str) -> tuple[int, str, str]:
@@ -119,53 +137,42 @@ def solve(input_path: str) -> int:
     with open(input_path, 'r') as input_file:
         lines = input_file.readlines()
 
-    CLOSE_TO_POINTS = {
-        '}': 1197,
-        ']': 57,
-        ')': 3,
-        '>': 25137
-    }
-
     lines = [l.replace('\n', '') for l in lines]
     res = [check_line(l) for l in lines]
     res = [r[1] for r in res if r[0] == -1]
-    return sum(CLOSE_TO_POINTS[r] for r in res)
-
-
-
-def solve(input_path: str) -> int:
-    with open(input_path, 'r') as input_file:
-        lines = input_file.readlines()
-
-    CLOSE_TO_POINTS = {
-        '}': 1197,
-        ']': 57,
-        ')': 3,
-        '>': 25137
-    }
-
-    lines = [l.replace('\n', '') for l in lines]
-    res = [check_line(l) for l in lines]
-    res = [r[1] for r in res if r[0] == -1]
-    return sum(CLOSE_TO_POINTS[r] for r in res)
+    return sum(CORRUPTED_POINTS[r] for r in res)
 
 
 def compute_score_line(expected_fifo: list[str]) -> int:
-    CLOSE_TO_POINTS = {
-        '}': 3,
-        ']': 2,
-        ')': 1,
-        '>': 4
-    }
-
     score = 0
     for c in reversed(expected_fifo):
         score *= 5
-        score += CLOSE_TO_POINTS[c]
+        score += COMPLETION_POINTS[c]
 
     return score
 
 
+def select_middle(scores: list[int]) -> int:
+    """Element at `len(scores) // 2` once sorted, without sorting.
+
+    Quickselect with a random pivot, in linear expected time.
+    """
+    k = len(scores) // 2
+    while True:
+        pivot = random.choice(scores)
+        lower = [s for s in scores if s < pivot]
+        if k < len(lower):
+            scores = lower
+            continue
+
+        n_equal = sum(1 for s in scores if s == pivot)
+        if k < len(lower) + n_equal:
+            return pivot
+
+        k -= len(lower) + n_equal
+        scores = [s for s in scores if s > pivot]
+
+
 def solve_2(input_path: str) -> int:
     with open(input_path, 'r') as input_file:
         lines = input_file.readlines()
@@ -175,9 +182,196 @@ def solve_2(input_path: str) -> int:
     res = [check_line(l) for l in lines]
     res = [r[1] for r in res if r[0] == 1]
     res = [compute_score_line(r) for r in res]
-    res = list(sorted(res))
 
-    return res[len(res) // 2]
+    return select_middle(res)
+
+
+def check_lines(lines: Iterable[str]) -> tuple[int, list[int]]:
+    """Check each line once, for both parts.
+
+    Return the total corruption score and the completion score
+    of every incomplete line.
+    """
+    corruption = 0
+    completions = []
+    for line in lines:
+        status, found, _ = check_line(line.replace('\n', ''))
+        if status == -1:
+            corruption += CORRUPTED_POINTS[found]
+        elif status == 1:
+            completions.append(compute_score_line(found))
+
+    return corruption, completions
+
+
+def solve_single_pass(input_path: str) -> tuple[int, int]:
+    """Both parts from a single read of the file."""
+    with open(input_path, 'r') as input_file:
+        corruption, completions = check_lines(input_file)
+
+    return corruption, select_middle(completions)
+
+
+def line_ranges(input_path: str, n_ranges: int) -> list[tuple[int, int]]:
+    """Split the file into byte ranges starting and ending on a new line."""
+    size = os.path.getsize(input_path)
+    boundaries = [0]
+    with open(input_path, 'rb') as input_file:
+        for i in range(1, n_ranges):
+            input_file.seek(max(i * size // n_ranges, boundaries[-1]))
+            input_file.readline()  # Move to the start of the next line
+            boundaries.append(min(input_file.tell(), size))
+    boundaries.append(size)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries[:-1], boundaries[1:])
+        if start < end
+    ]
+
+
+def check_range(input_path: str, start: int, end: int) -> tuple[int, list[int]]:
+    """`check_lines` on the lines between the two byte offsets."""
+    def read_lines():
+        with open(input_path, 'rb') as input_file:
+            input_file.seek(start)
+            while input_file.tell() < end:
+                yield input_file.readline().decode().rstrip('\r\n')
+
+    return check_lines(read_lines())
+
+
+def solve_parallel(input_path: str, n_workers: int = None) -> tuple[int, int]:
+    """Same as `solve_single_pass`, with the file split across processes."""
+    n_workers = n_workers or os.cpu_count()
+    ranges = line_ranges(input_path, n_workers)
+
+    with ProcessPoolExecutor(n_workers) as executor:
+        results = executor.map(
+            check_range,
+            [input_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+        )
+
+        corruption = 0
+        completions = []
+        for range_corruption, range_completions in results:
+            corruption += range_corruption
+            completions.extend(range_completions)
+
+    return corruption, select_middle(completions)
+
+
+class BracketDialect:
+    """Compiled delimiter set and score tables.
+
+    Every byte is translated once per chunk into a token: `IGNORED` for
+    the `ignored` bytes, `i + 1` for the opening delimiter of the pair `i`,
+    `CLOSE + i` for its closing one and `INVALID` for any other byte.
+    The checker then only compares small integers.
+    """
+    IGNORED = 0
+    CLOSE = 128
+    INVALID = 255
+
+    def __init__(
+            self,
+            open_to_close: dict[str, str],
+            corrupted_points: dict[str, int],
+            completion_points: dict[str, int],
+            ignored: bytes = b' \t\r\n',
+        ):
+        if len(open_to_close) >= self.INVALID - self.CLOSE:
+            raise ValueError(
+                f'At most {self.INVALID - self.CLOSE - 1} pairs are supported'
+            )
+
+        delimiters = list(open_to_close) + list(open_to_close.values())
+        for c in delimiters:
+            if len(c) != 1 or ord(c) > 255:
+                raise ValueError(f'Delimiters must be single bytes, got {c!r}')
+            if ord(c) in ignored:
+                raise ValueError(f'Delimiter {c!r} is also ignored')
+        if len(set(delimiters)) != len(delimiters):
+            raise ValueError('Delimiters must all be different')
+
+        table = bytearray([self.INVALID]) * 256
+        for c in ignored:
+            table[c] = self.IGNORED
+
+        self.corrupted_points = [0] * len(open_to_close)
+        self.completion_points = [0] * len(open_to_close)
+        for pair, (opening, closing) in enumerate(open_to_close.items()):
+            table[ord(opening)] = pair + 1
+            table[ord(closing)] = self.CLOSE + pair
+            self.corrupted_points[pair] = corrupted_points[closing]
+            self.completion_points[pair] = completion_points[closing]
+
+        self.table = bytes(table)
+
+
+DEFAULT_DIALECT = BracketDialect(OPEN_TO_CLOSE, CORRUPTED_POINTS, COMPLETION_POINTS)
+
+
+class IncrementalChecker:
+    """Check a single line fed by arbitrary chunks of bytes.
+
+    The stack of expected closing pairs is kept between calls and
+    the corruption is reported by the first `feed` that reaches it.
+    """
+    def __init__(self, dialect: BracketDialect = DEFAULT_DIALECT):
+        self.dialect = dialect
+        self.expected_fifo = []
+        self.corrupted = None  # Pair of the first illegal character
+
+    def feed(self, data: bytes) -> int:
+        """Return the corruption score, 0 as long as the line is valid."""
+        if self.corrupted is not None:
+            return self.dialect.corrupted_points[self.corrupted]
+
+        close = BracketDialect.CLOSE
+        expected_fifo = self.expected_fifo
+        for token in data.translate(self.dialect.table):
+            if token >= close:
+                if token == BracketDialect.INVALID:
+                    raise ValueError(f'Unexpected byte in {data!r}')
+                if not expected_fifo or expected_fifo.pop() != token:
+                    self.corrupted = token - close
+                    return self.dialect.corrupted_points[self.corrupted]
+            elif token:
+                expected_fifo.append(token + close - 1)
+
+        return 0
+
+    def finish(self) -> int:
+        """Completion score of the line, 0 if it is corrupted or complete."""
+        if self.corrupted is not None:
+            return 0
+
+        score = 0
+        for token in reversed(self.expected_fifo):
+            score = score * 5 + self.dialect.completion_points[token - BracketDialect.CLOSE]
+        return score
+
+
+def check_file_dialect(
+        input_path: str,
+        dialect: BracketDialect = DEFAULT_DIALECT,
+    ) -> tuple[int, list[int]]:
+    """`check_lines` for any dialect, reading raw bytes."""
+    corruption = 0
+    completions = []
+    with open(input_path, 'rb') as input_file:
+        for line in input_file:
+            checker = IncrementalChecker(dialect)
+            line_corruption = checker.feed(line)
+            if line_corruption:
+                corruption += line_corruption
+            elif score := checker.finish():
+                completions.append(score)
+
+    return corruption, completions
 
 
 if __name__ == '__main__':
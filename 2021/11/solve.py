@@ -295,6 +295,8 @@ After step 100:
 After 100 steps, there have been a total of 1656 flashes.
 Given the starting energy levels of the dumbo octopuses in your cavern, simulate 100 steps. How many total flashes are there after 100 steps?
 """
+from functools import lru_cache
+
 import numpy as np
 
 
@@ -307,28 +309,25 @@ def lines_to_matrix(lines: list[str]) -> np.array:
     return np.array(matrix)
 
 
-def neightbours(x: int, y: int, max_x: int, max_y: int) -> list[tuple]:
-    res = [
-        (x+1, y),
-        (x-1, y),
-        (x, y+1),
-        (x, y-1),
-        (x+1, y-1),
-        (x+1, y+1),
-        (x-1, y-1),
-        (x-1, y+1),
-    ]
-    res = [
-        cell for cell in res
-        if 0 <= cell[0] < max_x and 0 <= cell[1] < max_y  # Check bounds
-    ]
-    return res
+def neightbour_counts(flashes: np.array) -> np.array:
+    """Number of flashing neighbours of each cell.
+
+    Sum of the 8 shifted views of the padded mask. The grids are the
+    last two axes, so a batch of grids can be given at once.
+    """
+    height, width = flashes.shape[-2:]
+    padding = [(0, 0)] * (flashes.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(flashes.astype(int), padding)
+    counts = np.zeros(flashes.shape, dtype=int)
+    for dx in range(3):
+        for dy in range(3):
+            if (dx, dy) != (1, 1):
+                counts += padded[..., dx:dx + height, dy:dy + width]
+    return counts
 
 
 def add_to_neightbours(matrix: np.array, flashes: np.array) -> np.array:
-    for (x, y) in np.argwhere(flashes).tolist():
-        for neightbour in neightbours(x, y, matrix.shape[0], matrix.shape[1]):
-            matrix[neightbour] += 1
+    matrix += neightbour_counts(flashes)
     return matrix
 
 
@@ -373,6 +372,185 @@ def solve_2(input_path: str) -> int:
             return step_id
 
 
+def find_cycle(matrix: np.array) -> tuple[int, int, list[int]]:
+    """Simulate until a grid state is seen twice.
+
+    Return the first step of the cycle, its period and the cumulative
+    number of flashes after each simulated step. The grid always ends up
+    periodic, at the latest once all octopuses are synchronized.
+    """
+    matrix = matrix.copy()
+    seen = {matrix.tobytes(): 0}
+    cumulative = [0]
+
+    while True:
+        matrix, n = step(matrix)
+        cumulative.append(cumulative[-1] + int(n))
+
+        state = matrix.tobytes()
+        if state in seen:
+            start = seen[state]
+            return start, len(cumulative) - 1 - start, cumulative
+        seen[state] = len(cumulative) - 1
+
+
+def total_flashes(matrix: np.array, n_steps: int) -> int:
+    """Total flashes after `n_steps`, fast-forwarding over the cycle."""
+    start, period, cumulative = find_cycle(matrix)
+    if n_steps < len(cumulative):
+        return cumulative[n_steps]
+
+    n_cycles, remaining = divmod(n_steps - start, period)
+    per_cycle = cumulative[start + period] - cumulative[start]
+    return cumulative[start + remaining] + n_cycles * per_cycle
+
+
+def step_batch(matrices: np.array) -> tuple[np.array, np.array]:
+    """Same as `step` for a batch of grids of shape `[batch, H, W]`.
+
+    Return the updated grids and the number of flashes of each grid.
+    """
+    mask = np.ones(matrices.shape, dtype=bool)
+    matrices += 1
+    flashes = matrices > 9
+    total_flashs = np.zeros(len(matrices), dtype=int)
+
+    while flashes.any():
+        matrices += neightbour_counts(flashes)
+        mask &= ~flashes
+        total_flashs += flashes.sum(axis=(1, 2))
+
+        matrices *= mask
+        flashes = matrices > 9
+
+    return matrices, total_flashs
+
+
+def simulate_batch(
+        matrices: np.array,
+        n_steps: int = 100,
+        max_steps: int = 1000,
+    ) -> tuple[np.array, np.array]:
+    """Simulate many grids at once.
+
+    Return the total flashes of each grid after `n_steps` and the first
+    step where each grid flashes all at once (-1 if not found within
+    `max(n_steps, max_steps)` steps). A grid stops being simulated once
+    both are known.
+    """
+    matrices = matrices.copy()
+    n_cells = matrices.shape[1] * matrices.shape[2]
+    totals = np.zeros(len(matrices), dtype=int)
+    synchronized = np.full(len(matrices), -1)
+
+    for step_id in range(1, max(n_steps, max_steps) + 1):
+        active = (synchronized == -1) | (step_id <= n_steps)
+        if not active.any():
+            break
+
+        matrices[active], flashes = step_batch(matrices[active])
+        if step_id <= n_steps:
+            totals[active] += flashes
+
+        sync = np.zeros(len(matrices), dtype=bool)
+        sync[active] = flashes == n_cells
+        synchronized[sync & (synchronized == -1)] = step_id
+
+    return totals, synchronized
+
+
+def solve_fast_forward(input_path: str, n_steps: int) -> int:
+    with open(input_path, 'r') as input_file:
+        lines = input_file.readlines()
+
+    return total_flashes(lines_to_matrix(lines), n_steps)
+
+
+def build_neightbour_table(mask: np.array) -> tuple[np.array, np.array]:
+    """Neighbours of every cell of the mask, in CSR form.
+
+    The neighbours of the flat cell `i` are `indices[offsets[i]:offsets[i+1]]`.
+    Cells outside of the mask have no neighbours and are nobody's
+    neighbour, so any irregular grid can be described.
+    """
+    height, width = mask.shape
+    rows, cols = np.indices(mask.shape)
+    sources, targets = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            if (dx, dy) == (0, 0):
+                continue
+
+            n_rows, n_cols = rows + dx, cols + dy
+            valid = (0 <= n_rows) & (n_rows < height) & (0 <= n_cols) & (n_cols < width)
+            valid[valid] &= mask[n_rows[valid], n_cols[valid]]
+            valid &= mask
+            sources.append((rows * width + cols)[valid])
+            targets.append((n_rows * width + n_cols)[valid])
+
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    order = np.argsort(sources, kind='stable')
+    counts = np.bincount(sources, minlength=mask.size)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return offsets, targets[order]
+
+
+@lru_cache
+def neightbour_table(
+        shape: tuple[int, int],
+        mask_bytes: bytes = None,
+    ) -> tuple[np.array, np.array]:
+    """Cached table of a grid, keyed by its shape and its mask bytes.
+
+    Without a mask, the table of the full rectangular grid is returned.
+    """
+    if mask_bytes is None:
+        mask = np.ones(shape, dtype=bool)
+    else:
+        mask = np.frombuffer(mask_bytes, dtype=bool).reshape(shape)
+    return build_neightbour_table(mask)
+
+
+def gather_neightbours(offsets: np.array, indices: np.array, cells: np.array) -> np.array:
+    """Concatenated neighbours of all the given cells."""
+    starts, lengths = offsets[cells], offsets[cells + 1] - offsets[cells]
+    shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[shifts + np.arange(lengths.sum())]
+
+
+def step_csr(matrix: np.array, mask: np.array = None) -> tuple[np.array, int]:
+    """Same as `step`, with the flashes propagated through a CSR table.
+
+    The table is built from `mask` and cached. Cells outside of `mask`
+    are left untouched.
+    """
+    if mask is None:
+        offsets, indices = neightbour_table(matrix.shape)
+        active = np.ones(matrix.size, dtype=bool)
+    else:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != matrix.shape:
+            raise ValueError('The mask must have the shape of the grid')
+        offsets, indices = neightbour_table(mask.shape, mask.tobytes())
+        active = mask.ravel()
+
+    energy = matrix.ravel().copy()
+    energy[active] += 1
+    flashed = np.zeros(matrix.size, dtype=bool)
+    flashes = np.flatnonzero((energy > 9) & active)
+
+    while flashes.size:
+        flashed[flashes] = True
+        energy += np.bincount(
+            gather_neightbours(offsets, indices, flashes),
+            minlength=matrix.size,
+        )
+        flashes = np.flatnonzero((energy > 9) & active & ~flashed)
+
+    energy[flashed] = 0
+    return energy.reshape(matrix.shape), flashed.sum()
+
+
 if __name__ == '__main__':
     print('Solution for day 11')
 
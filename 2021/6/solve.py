@@ -54,25 +54,60 @@ After 256 days in the example above, there would be a total of 26984457539 lante
 
 How many lanternfish would there be after 256 days?
 """
+from functools import lru_cache
+from typing import Iterator
+
 import numpy as np
 
 
+INT64_MAX = np.iinfo(np.int64).max
+
+
 class LanternfishModel:
     def __init__(
             self,
             initial_state: list[int],
             birth_rate: int = 7,
             mature_count: int = 2,
+            exact: bool = False,
         ):
+        """When `exact` is set, the population is promoted to Python
+        integers before it can overflow `int64`.
+        """
         self.birth_rate = birth_rate
         self.mature_count = mature_count
-        self.population = np.zeros(birth_rate + mature_count, dtype=int)
+        self.population = np.zeros(birth_rate + mature_count, dtype=np.int64)
 
         for day_counter in initial_state:
             self.population[day_counter] += 1
 
+        self.exact = exact
+        self.safe_days = 0
+
+    def check_overflow(self):
+        """Promote the population to Python integers if needed.
+
+        The total population can at most double each day, so the
+        number of days that fit into `int64` is computed once and only
+        recomputed when this budget is exhausted.
+        """
+        if self.safe_days > 0:
+            self.safe_days -= 1
+            return
+
+        total = int(self.population.sum())
+        self.safe_days = (INT64_MAX // max(total, 1)).bit_length() - 1
+        if self.safe_days == 0:
+            self.population = self.population.astype(object)
+        else:
+            self.safe_days -= 1
+
     def next_day(self):
-        n_population = np.zeros(self.population.shape, dtype=int)
+        # Python integers never overflow, no need to check once promoted
+        if self.exact and self.population.dtype != object:
+            self.check_overflow()
+
+        n_population = np.zeros(self.population.shape, dtype=self.population.dtype)
 
         # New births
         n_population[self.birth_rate + self.mature_count - 1] = self.population[0]
@@ -84,18 +119,179 @@ class LanternfishModel:
         self.population = n_population
 
 
-def solve(input_path: str, n_days: int) -> int:
+class BatchedLanternfishModel:
+    """Simulate many independent schools at once.
+
+    Each row of `population` is a school with its own `birth_rate` and
+    `mature_count`. Rows are padded with zeros up to the largest cycle.
+    """
+    def __init__(
+            self,
+            initial_states: list[list[int]],
+            birth_rates: list[int],
+            mature_counts: list[int],
+            dtype: type = int,
+        ):
+        """Use `dtype=object` to get exact Python integers."""
+        self.birth_rates = np.array(birth_rates, dtype=int)
+        self.mature_counts = np.array(mature_counts, dtype=int)
+        cycles = self.birth_rates + self.mature_counts
+        batch_size, width = len(initial_states), cycles.max()
+
+        self.population = np.zeros((batch_size, width), dtype=dtype)
+        for row, initial_state in enumerate(initial_states):
+            if initial_state and max(initial_state) >= cycles[row]:
+                raise ValueError(
+                    f'Timers of row {row} must be lower than {cycles[row]}'
+                )
+            np.add.at(self.population[row], initial_state, 1)
+
+        # Rotation of each row on its own cycle, padding stays untouched
+        columns = np.arange(width)[None, :]
+        self.valid = columns < cycles[:, None]
+        self.rotation = np.where(
+            self.valid,
+            (columns + 1) % cycles[:, None],
+            columns,
+        )
+        self.rows = np.arange(batch_size)
+
+    def next_day(self):
+        births = self.population[:, 0].copy()
+        self.population = np.take_along_axis(self.population, self.rotation, axis=1)
+        self.population *= self.valid
+        # Parents restart their cycle, newborns were rotated to the end
+        self.population[self.rows, self.birth_rates - 1] += births
+
+    def totals(self) -> np.array:
+        return self.population.sum(axis=1)
+
+
+def daily_totals(
+        initial_state: list[int],
+        n_days: int,
+        birth_rate: int = 7,
+        mature_count: int = 2,
+    ) -> Iterator[int]:
+    """Yield the total population after each of the `n_days` days.
+
+    The buckets are never copied: instead of shifting the values, the
+    index of the bucket holding the timer `0` is rotated.
+    """
+    population = [0] * (birth_rate + mature_count)
+    for day_counter in initial_state:
+        population[day_counter] += 1
+
+    total = len(initial_state)
+    zero = 0  # Index of the bucket with a timer of 0
+    for _ in range(n_days):
+        births = population[zero]
+        # The old '0' bucket now holds the newborns
+        zero = (zero + 1) % len(population)
+        population[(zero + birth_rate - 1) % len(population)] += births
+        total += births
+        yield total
+
+
+def population_trajectory(initial_state: list[int], n_days: int) -> np.array:
+    """Total population of each day, from day 1 to `n_days`."""
+    trajectory = np.empty(n_days, dtype=object)
+    for day, total in enumerate(daily_totals(initial_state, n_days)):
+        trajectory[day] = total
+    return trajectory
+
+
+@lru_cache
+def growth_table(
+        days: tuple[int],
+        birth_rate: int = 7,
+        mature_count: int = 2,
+    ) -> np.array:
+    """Population reached by a single fish for each starting timer.
+
+    Return an array of shape `[birth_rate + mature_count, len(days)]`
+    where `table[t, i]` is the number of fish after `days[i]` days
+    starting from one fish with a timer of `t`. The table holds Python
+    integers, so long horizons do not overflow.
+    """
+    n_timers = birth_rate + mature_count
+    model = BatchedLanternfishModel(
+        [[t] for t in range(n_timers)],
+        [birth_rate] * n_timers,
+        [mature_count] * n_timers,
+        dtype=object,
+    )
+
+    table = np.zeros((n_timers, len(days)), dtype=object)
+    days = np.array(days)
+    for day in range(days.max() + 1):
+        table[:, days == day] = model.totals()[:, None]
+        model.next_day()
+
+    return table
+
+
+def solve(input_path: str, n_days: int, exact: bool = False) -> int:
     with open(input_path, 'r') as input_file:
         initial_state = next(input_file).replace('\n', '').split(',')
         initial_state = [int(n) for n in initial_state]
 
-    model = LanternfishModel(initial_state)
+    model = LanternfishModel(initial_state, exact=exact)
     for _ in range(n_days):
         model.next_day()
 
     return model.population.sum()
 
 
+def solve_sweep(
+        input_path: str,
+        n_days: int,
+        birth_rates: list[int],
+        mature_counts: list[int],
+        dtype: type = int,
+    ) -> np.array:
+    """Total population for each `(birth_rate, mature_count)` pair.
+
+    Use `dtype=object` for long sweeps that would overflow `int64`.
+    """
+    with open(input_path, 'r') as input_file:
+        initial_state = next(input_file).replace('\n', '').split(',')
+        initial_state = [int(n) for n in initial_state]
+
+    model = BatchedLanternfishModel(
+        [initial_state] * len(birth_rates),
+        birth_rates,
+        mature_counts,
+        dtype=dtype,
+    )
+    for _ in range(n_days):
+        model.next_day()
+
+    return model.totals()
+
+
+def solve_many(
+        input_paths: list[str],
+        n_days: int,
+        birth_rate: int = 7,
+        mature_count: int = 2,
+    ) -> np.array:
+    """Final population of many schools using the growth table.
+
+    The population is linear in the initial counts, so each school is a
+    single dot product with the cached table.
+    """
+    n_timers = birth_rate + mature_count
+    counts = np.zeros((len(input_paths), n_timers), dtype=object)
+    for row, input_path in enumerate(input_paths):
+        with open(input_path, 'r') as input_file:
+            initial_state = next(input_file).replace('\n', '').split(',')
+            np.add.at(counts[row], [int(n) for n in initial_state], 1)
+
+    table = growth_table((n_days, ), birth_rate, mature_count)
+    return counts @ table[:, 0]
+
+
 if __name__ == '__main__':
     print('Solution of day 6')
 
@@ -48,6 +48,8 @@ As each crab moves, moving further becomes more expensive. This changes the best
 This costs a total of 168 fuel. This is the new cheapest possible outcome; the old alignment position (2) now costs 206 fuel instead.
 Determine the horizontal position that the crabs can align to using the least fuel possible so they can make you an escape route! How much fuel must they spend to align to that position?
 """
+from typing import Callable
+
 import numpy as np
 
 
@@ -60,15 +62,109 @@ def solve(input_path: str) -> int:
     with open(input_path, 'r') as input_file:
         crabs = input_file.read().replace('\n', '')
         crabs = np.array([int(n) for n in crabs.split(',')])
-    crabs = np.sort(crabs)
     index = len(crabs) // 2
-    return fuel_consumption(crabs, crabs[index])
+    median = np.partition(crabs, index)[index]
+    return fuel_consumption(crabs, median)
+
+
+def read_histogram(input_path: str, chunk_size: int = 1 << 20) -> np.array:
+    """Histogram of the crab positions, parsed by chunks.
+
+    Only the histogram is kept in memory, so its size depends on the
+    range of the positions and not on the number of crabs.
+    """
+    counts = np.zeros(0, dtype=np.int64)
+    pending = ''  # Number cut by the end of the previous chunk
+
+    with open(input_path, 'r') as input_file:
+        while chunk := input_file.read(chunk_size):
+            chunk = pending + chunk.replace('\n', '')
+            chunk, _, pending = chunk.rpartition(',')
+            if not chunk:
+                continue
+
+            chunk_counts = np.bincount(np.array(chunk.split(','), dtype=np.int64))
+            if len(chunk_counts) > len(counts):
+                chunk_counts[:len(counts)] += counts
+                counts = chunk_counts
+            else:
+                counts[:len(chunk_counts)] += chunk_counts
+
+    if pending:
+        last = int(pending)
+        if last >= len(counts):
+            counts = np.pad(counts, (0, last + 1 - len(counts)))
+        counts[last] += 1
+
+    return counts
+
+
+def read_aggregated(input_path: str) -> np.array:
+    """Histogram from a file of `position,count` lines."""
+    data = np.loadtxt(input_path, delimiter=',', dtype=np.int64, ndmin=2)
+    counts = np.zeros(data[:, 0].max() + 1, dtype=np.int64)
+    np.add.at(counts, data[:, 0], data[:, 1])  # Exact, unlike float weights
+    return counts
+
+
+def histogram_median(counts: np.array) -> int:
+    """Same median as `solve`, i.e. the element at `n // 2` once sorted."""
+    cumulative = np.cumsum(counts)
+    return np.searchsorted(cumulative, cumulative[-1] // 2, side='right')
+
+
+def solve_counts(input_path: str, aggregated: bool = False) -> int:
+    counts = read_aggregated(input_path) if aggregated else read_histogram(input_path)
+    median = histogram_median(counts)
+    distances = np.abs(np.arange(len(counts)) - median)
+    return (counts * distances).sum()
 
 
 def fuel_consumption_2(crabs: np.array, horizontal: int) -> int:
     steps = np.abs(crabs - horizontal)
-    consumption = [n * (n + 1) / 2 for n in steps]
-    return np.sum(consumption).astype(int)
+    consumption = steps * (steps + 1) // 2
+    return np.sum(consumption)
+
+
+def histogram(crabs: np.array) -> np.array:
+    """Number of crabs at each horizontal position, from 0 to the max."""
+    return np.bincount(crabs)
+
+
+def linear_costs(counts: np.array) -> np.array:
+    """Part 1 fuel consumption for every position of the histogram.
+
+    Computed with prefix sums of the counts and of the weighted counts.
+    """
+    positions = np.arange(len(counts))
+    weighted = counts * positions
+
+    # Crabs strictly on the left and on the right of each position
+    count_left = np.cumsum(counts) - counts
+    weighted_left = np.cumsum(weighted) - weighted
+    count_right = counts.sum() - count_left - counts
+    weighted_right = weighted.sum() - weighted_left - weighted
+
+    return (
+        positions * count_left - weighted_left
+        + weighted_right - positions * count_right
+    )
+
+
+def triangular_costs(counts: np.array) -> np.array:
+    """Part 2 fuel consumption for every position of the histogram.
+
+    The cost of a move of `d` steps is `d * (d + 1) / 2`, so the total is
+    half of the sum of the squared distances plus the absolute distances.
+    """
+    positions = np.arange(len(counts))
+    weighted = counts * positions
+    squared = (
+        (weighted * positions).sum()
+        - 2 * positions * weighted.sum()
+        + positions**2 * counts.sum()
+    )
+    return (squared + linear_costs(counts)) // 2
 
 
 def solve_2(input_path: str) -> int:
@@ -76,9 +172,76 @@ def solve_2(input_path: str) -> int:
         crabs = input_file.read().replace('\n', '')
         crabs = np.array([int(n) for n in crabs.split(',')])
 
-    mean = np.round(np.mean(crabs))
-    mean -= 1  # Works for my input, but why?
-    return fuel_consumption_2(crabs, mean)
+    costs = triangular_costs(histogram(crabs))
+    return costs.min()
+
+
+def total_cost(
+        counts: np.array,
+        cost: Callable[[np.array], np.array],
+        horizontal: int,
+    ) -> int:
+    """Total fuel to align the histogram on `horizontal`.
+
+    `cost` maps an array of distances to an array of fuel consumptions.
+    """
+    return total_costs(counts, cost, np.array([horizontal]))[0]
+
+
+def total_costs(
+        counts: np.array,
+        cost: Callable[[np.array], np.array],
+        horizontals: np.array,
+    ) -> np.array:
+    """Total fuel for each of the `horizontals`, in one cost evaluation."""
+    distances = np.abs(np.arange(len(counts))[:, None] - horizontals[None, :])
+    return counts @ cost(distances)
+
+
+def convex_minimum(
+        counts: np.array,
+        cost: Callable[[np.array], np.array],
+    ) -> tuple[int, int]:
+    """Integer ternary search of the best alignment for a convex cost.
+
+    Return the best position and its total cost. Each iteration does one
+    vectorized evaluation of the cost over the histogram, for both
+    `middle` and `middle + 1`.
+    """
+    low, high = 0, len(counts) - 1
+    while high - low > 2:
+        middle = (low + high) // 2
+        left, right = total_costs(counts, cost, np.array([middle, middle + 1]))
+        if left <= right:
+            high = middle + 1  # Minimum is on the left of `middle + 1`
+        else:
+            low = middle + 1
+
+    candidates = np.arange(low, high + 1)
+    costs = total_costs(counts, cost, candidates)
+    best = costs.argmin()
+    return int(candidates[best]), costs[best]
+
+
+def linear_cost(distances: np.array) -> np.array:
+    return distances
+
+
+def triangular_cost(distances: np.array) -> np.array:
+    return distances * (distances + 1) // 2
+
+
+def quadratic_cost(distances: np.array) -> np.array:
+    return distances**2
+
+
+def cost_curve(input_path: str, triangular: bool = False) -> np.array:
+    """Fuel consumption of every alignment position, from 0 to the max.
+
+    Any position can then be queried in O(1).
+    """
+    counts = read_histogram(input_path)
+    return triangular_costs(counts) if triangular else linear_costs(counts)
 
 
 if __name__ == '__main__':
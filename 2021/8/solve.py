@@ -119,6 +119,9 @@ Following this same process for each entry in the second, larger example above,
 Adding all of the output values in this larger example produces 61229.
 For each entry, determine all of the wire/segment connections and decode the four-digit output values. What do you get if you add up all of the output values?
 """
+from functools import lru_cache
+from typing import Optional
+
 import numpy as np
 
 
@@ -136,6 +139,26 @@ num_to_real = {
 }
 
 
+def to_bitmask(segments) -> int:
+    """Encode segments 'a' to 'g' as bits 0 to 6."""
+    mask = 0
+    for c in segments:
+        mask |= 1 << (ord(c) - ord('a'))
+    return mask
+
+
+# Number of digits using each segment, and sum of those frequencies
+# over the segments of each digit (unique per digit)
+SEGMENT_FREQUENCIES = [
+    sum(chr(ord('a') + bit) in real for real in num_to_real.values())
+    for bit in range(7)
+]
+SCORE_TO_NUM = {
+    sum(SEGMENT_FREQUENCIES[ord(c) - ord('a')] for c in real): num
+    for num, real in num_to_real.items()
+}
+
+
 class MasterMind:
     def __init__(self, numbers: list[set], output: list[set]):
         self.numbers = numbers
@@ -160,7 +183,8 @@ class MasterMind:
             for fake in to_remove:
                 propositions.remove(fake)
 
-    def solve(self):
+    def resolve(self) -> dict[frozenset, int]:
+        """Find the digit of each of the ten patterns."""
         # Initialise hints
         hints = {
             num: [n for n in self.numbers if len(n) == len(real)]
@@ -174,11 +198,13 @@ class MasterMind:
                     sure = sure[0]
                     MasterMind.remove_unvalids(num, sure, hints)
 
-        fake_to_num = {
+        return {
             frozenset(propositions[0]): num
             for num, propositions in hints.items()
         }
 
+    def solve(self):
+        fake_to_num = self.resolve()
         return [fake_to_num[frozenset(fake)] for fake in self.output]
 
 
@@ -191,6 +217,298 @@ def process_line(line: str) -> MasterMind:
     return MasterMind(numbers, output)
 
 
+def decode_signatures(numbers: list[int], output: list[int]) -> list[int]:
+    """Decode the output bitmasks without searching the wiring.
+
+    A wire is used by as many of the ten patterns as its real segment
+    is used by the ten digits, so the sum of the frequencies of the wires
+    of a pattern identifies its digit.
+    """
+    frequencies = [
+        sum((pattern >> bit) & 1 for pattern in numbers)
+        for bit in range(7)
+    ]
+    return [
+        SCORE_TO_NUM[sum(
+            frequencies[bit] for bit in range(7) if (pattern >> bit) & 1
+        )]
+        for pattern in output
+    ]
+
+
+def process_line_bitmask(line: str) -> tuple[list[int], list[int]]:
+    numbers, output = line.replace('\n', '').split(' | ')
+    numbers = [to_bitmask(p) for p in numbers.split(' ')]
+    output = [to_bitmask(p) for p in output.split(' ')]
+    return numbers, output
+
+
+def parse_bitmasks(input_path: str) -> np.array:
+    """Parse the whole file into a `[n_lines, 14]` array of bitmasks.
+
+    Each word starts at a letter that follows a non-letter. Since a
+    segment appears at most once in a word, summing the bits of its
+    letters is the same as OR-ing them.
+    """
+    with open(input_path, 'rb') as input_file:
+        data = np.frombuffer(input_file.read(), dtype=np.uint8)
+
+    is_letter = (data >= ord('a')) & (data <= ord('g'))
+    shifts = np.where(is_letter, data - ord('a'), 0)
+    bits = np.where(is_letter, 1 << shifts, 0).astype(np.uint8)
+    starts = np.flatnonzero(is_letter & ~np.concatenate([[False], is_letter[:-1]]))
+
+    masks = np.add.reduceat(bits, starts, dtype=np.uint8)
+    return masks.reshape(-1, 14)
+
+
+SCORE_TABLE = np.zeros(max(SCORE_TO_NUM) + 1, dtype=np.uint8)
+SCORE_TABLE[list(SCORE_TO_NUM)] = list(SCORE_TO_NUM.values())
+
+
+def decode_batch(masks: np.array) -> np.array:
+    """Vectorized `decode_signatures` of all the lines at once.
+
+    Return the `[n_lines, 4]` array of decoded digits.
+    """
+    bits = np.unpackbits(masks[..., None], axis=-1, bitorder='little')[..., :7]
+    frequencies = bits[:, :10].sum(axis=1, dtype=np.int64)
+    scores = (bits[:, 10:] * frequencies[:, None, :]).sum(axis=-1)
+    return SCORE_TABLE[scores]
+
+
+@lru_cache(maxsize=4096)
+def resolve_wiring(patterns: tuple[str]) -> dict[frozenset, int]:
+    """Cached `MasterMind.resolve`, keyed by the canonical patterns.
+
+    Use `resolve_wiring.cache_info()` to get the hits and misses.
+    """
+    return MasterMind([set(p) for p in patterns], []).resolve()
+
+
+def wiring_key(numbers: list[set]) -> tuple[str]:
+    """Same key for any order of the patterns and of their segments."""
+    return tuple(sorted(''.join(sorted(p)) for p in numbers))
+
+
+def solve_line_cached(line: str) -> list[int]:
+    mastermind = process_line(line)
+    fake_to_num = resolve_wiring(wiring_key(mastermind.numbers))
+    return [fake_to_num[frozenset(fake)] for fake in mastermind.output]
+
+
+def cache_hit_rate() -> float:
+    info = resolve_wiring.cache_info()
+    calls = info.hits + info.misses
+    return info.hits / calls if calls else 0.0
+
+
+class SegmentDecoder:
+    """Decoder for any display given its alphabet of symbols.
+
+    The wiring is solved with bitmasks: each wire keeps the bitmask of
+    the segments it can be connected to, and each pattern keeps the
+    symbols it can display. Both are pruned against each other until
+    nothing changes, and a backtracking on the wires is used when the
+    propagation alone is not enough.
+
+    The wires are named with the same letters as the segments. When the
+    patterns are every symbol exactly once, the wires are first matched
+    to the segments used by as many symbols as they are lit. With fewer
+    patterns a `ValueError` is raised when the answer is not unique.
+    """
+    def __init__(self, alphabet: dict[object, set[str]]):
+        self.segments = sorted(set().union(*alphabet.values()))
+        self.full = (1 << len(self.segments)) - 1
+        self.symbols = {
+            self.to_mask(real, self.segments): symbol
+            for symbol, real in alphabet.items()
+        }
+
+    @staticmethod
+    def to_mask(letters: set[str], alphabet: list[str]) -> int:
+        mask = 0
+        for c in letters:
+            mask |= 1 << alphabet.index(c)
+        return mask
+
+    def propagate(
+            self,
+            patterns: list[int],
+            candidates: list[int],
+            options: list[list[int]],
+        ) -> bool:
+        """Prune the candidates and options in place until a fixpoint.
+
+        `candidates[w]` is the mask of the possible segments of the wire
+        `w`, `options[p]` the possible symbol masks of the pattern `p`.
+        Return False if a contradiction is found.
+        """
+        changed = True
+        while changed:
+            changed = False
+
+            for p, pattern in enumerate(patterns):
+                wires = [w for w in range(len(candidates)) if (pattern >> w) & 1]
+                others = [w for w in range(len(candidates)) if not (pattern >> w) & 1]
+                valid = [
+                    real for real in options[p]
+                    if all(candidates[w] & real for w in wires)
+                    and all(candidates[w] & ~real for w in others)
+                ]
+                if not valid:
+                    return False
+                if len(valid) != len(options[p]):
+                    options[p] = valid
+                    changed = True
+
+                inside, outside = 0, 0
+                for real in valid:
+                    inside |= real
+                    outside |= self.full & ~real
+                for w, allowed in [(w, inside) for w in wires] + [(w, outside) for w in others]:
+                    if candidates[w] & ~allowed:
+                        candidates[w] &= allowed
+                        changed = True
+
+            # A connected wire or a found symbol is not available to others
+            for w, mask in enumerate(candidates):
+                if mask == 0:
+                    return False
+                if mask & (mask - 1) == 0:
+                    for o in range(len(candidates)):
+                        if o != w and candidates[o] & mask:
+                            candidates[o] &= ~mask
+                            changed = True
+
+            for p, valid in enumerate(options):
+                if len(valid) == 1:
+                    for o in range(len(options)):
+                        if o != p and valid[0] in options[o]:
+                            options[o] = [r for r in options[o] if r != valid[0]]
+                            changed = True
+
+        return True
+
+    def search(
+            self,
+            patterns: list[int],
+            candidates: list[int],
+            options: list[list[int]],
+        ) -> Optional[list[int]]:
+        """Propagate, then backtrack on the least constrained wire."""
+        if not self.propagate(patterns, candidates, options):
+            return None
+
+        undecided = [w for w, mask in enumerate(candidates) if mask & (mask - 1)]
+        if not undecided:
+            return candidates
+
+        wire = min(undecided, key=lambda w: bin(candidates[w]).count('1'))
+        mask = candidates[wire]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+
+            guess = candidates.copy()
+            guess[wire] = bit
+            solution = self.search(patterns, guess, [o.copy() for o in options])
+            if solution is not None:
+                return solution
+
+        return None
+
+    def constraints(
+            self,
+            patterns: list[set[str]],
+        ) -> tuple[list[int], list[int], list[list[int]]]:
+        """Initial masks of the distinct patterns, wire candidates and
+        pattern options.
+        """
+        wires = self.segments
+        if not set().union(*patterns) <= set(wires):
+            raise ValueError('The patterns use unknown wires')
+
+        masks = sorted({self.to_mask(p, wires) for p in patterns})
+        candidates = [self.full] * len(wires)
+
+        # A wire is lit by as many patterns as its segment by symbols
+        if len(masks) == len(self.symbols):
+            segment_frequencies = [
+                sum((real >> s) & 1 for real in self.symbols)
+                for s in range(len(self.segments))
+            ]
+            for w in range(len(wires)):
+                count = sum((mask >> w) & 1 for mask in masks)
+                candidates[w] = self.to_mask(
+                    [c for c, f in zip(self.segments, segment_frequencies) if f == count],
+                    self.segments,
+                )
+
+        options = [
+            [real for real in self.symbols if bin(real).count('1') == bin(mask).count('1')]
+            for mask in masks
+        ]
+        return masks, candidates, options
+
+    @staticmethod
+    def rewire(mask: int, solution: list[int]) -> int:
+        """Segments lit by the wires of `mask`."""
+        real = 0
+        for w, segment in enumerate(solution):
+            if (mask >> w) & 1:
+                real |= segment
+        return real
+
+    def solve_wiring(self, patterns: list[set[str]]) -> dict[str, str]:
+        """Find the segment connected to each wire.
+
+        Raise a `ValueError` if the patterns allow another wiring.
+        """
+        masks, candidates, options = self.constraints(patterns)
+        solution = self.search(masks, candidates.copy(), [o.copy() for o in options])
+        if solution is None:
+            raise ValueError('No wiring is consistent with the patterns')
+
+        for w, segment in enumerate(solution):
+            other = candidates.copy()
+            other[w] &= ~segment
+            if self.search(masks, other, [o.copy() for o in options]) is not None:
+                raise ValueError('The patterns allow more than one wiring')
+
+        return {
+            wire: self.segments[mask.bit_length() - 1]
+            for wire, mask in zip(self.segments, solution)
+        }
+
+    def decode(self, patterns: list[set[str]], output: list[set[str]]) -> list:
+        """Decode the output, which only needs its symbols to be unique.
+
+        The outputs are constrained as patterns too. For each of them,
+        another wiring displaying a different symbol is searched for, and
+        a `ValueError` is raised if one exists.
+        """
+        masks, candidates, options = self.constraints(patterns + output)
+        solution = self.search(masks, candidates.copy(), [o.copy() for o in options])
+        if solution is None:
+            raise ValueError('No wiring is consistent with the patterns')
+
+        decoded = dict()
+        for fake in output:
+            mask = self.to_mask(fake, self.segments)
+            if mask in decoded:
+                continue
+
+            real = self.rewire(mask, solution)
+            others = [o.copy() for o in options]
+            index = masks.index(mask)
+            others[index] = [r for r in others[index] if r != real]
+            if self.search(masks, candidates.copy(), others) is not None:
+                raise ValueError(f'The output {sorted(fake)} is ambiguous')
+            decoded[mask] = self.symbols[real]
+
+        return [decoded[self.to_mask(fake, self.segments)] for fake in output]
+
 def solve(input_path: str) -> int:
     with open(input_path, 'r') as input_file:
         iterable = iter(input_file)
@@ -218,6 +536,29 @@ def solve_2(input_path: str) -> int:
     return values.sum()
 
 
+def solve_2_signatures(input_path: str) -> int:
+    with open(input_path, 'r') as input_file:
+        values = [
+            decode_signatures(*process_line_bitmask(line))
+            for line in input_file
+        ]
+
+    return sum(
+        int(''.join(str(n) for n in numbers))
+        for numbers in values
+    )
+
+
+def solve_bulk(input_path: str) -> int:
+    digits = decode_batch(parse_bitmasks(input_path))
+    return np.isin(digits, [1, 4, 7, 8]).sum()
+
+
+def solve_2_bulk(input_path: str) -> int:
+    digits = decode_batch(parse_bitmasks(input_path))
+    return (digits @ np.array([1000, 100, 10, 1])).sum()
+
+
 if __name__ == '__main__':
     print('Solution for day 8')
 
@@ -59,6 +59,8 @@ The bottom-right basin, size 9:
 Find the three largest basins and multiply their sizes together. In the above example, this is 9 * 14 * 9 = 1134.
 What do you get if you multiply together the sizes of the three largest basins?
 """
+import heapq
+
 import numpy as np
 
 
@@ -166,6 +168,261 @@ def solve_2(input_path: str) -> int:
     return sizes[0] * sizes[1] * sizes[2]
 
 
+def find_roots(parents: np.array) -> np.array:
+    """Pointer jumping until each node points to its root."""
+    while True:
+        grand_parents = parents[parents]
+        if (grand_parents == parents).all():
+            return parents
+        parents = grand_parents
+
+
+def label_basins(matrix: np.array) -> np.array:
+    """Label the 4-connected regions of non-9 cells.
+
+    Vectorized union-find over the flat indices: every edge between two
+    walkable cells hooks the larger root onto the smaller one, followed
+    by pointer jumping, until both ends of all edges share a root.
+    Cells of height 9 are labelled -1.
+    """
+    walkable = (matrix != 9).ravel()
+    indices = np.arange(matrix.size).reshape(matrix.shape)
+
+    # Edges between horizontal and vertical walkable neighbours
+    sources = np.concatenate([indices[:, :-1].ravel(), indices[:-1].ravel()])
+    targets = np.concatenate([indices[:, 1:].ravel(), indices[1:].ravel()])
+    edges = walkable[sources] & walkable[targets]
+    sources, targets = sources[edges], targets[edges]
+
+    parents = np.arange(matrix.size)
+    while True:
+        root_sources, root_targets = parents[sources], parents[targets]
+        pending = root_sources != root_targets
+        if not pending.any():
+            break
+
+        root_sources, root_targets = root_sources[pending], root_targets[pending]
+        np.minimum.at(
+            parents,
+            np.maximum(root_sources, root_targets),
+            np.minimum(root_sources, root_targets),
+        )
+        parents = find_roots(parents)
+
+    return np.where(walkable, parents, -1).reshape(matrix.shape)
+
+
+def solve_2_labels(input_path: str) -> int:
+    with open(input_path, 'r') as input_file:
+        lines = input_file.readlines()
+
+    labels = label_basins(to_matrix(lines))
+    sizes = np.bincount(labels[labels != -1])
+    sizes = np.partition(sizes, -3)[-3:]
+    return sizes.prod()
+
+
+class StreamingBasins:
+    """Basins and low points of a heightmap fed row by row.
+
+    Only the last rows are kept: the labels of the previous row and a
+    three-row window for the low points. Labels are merged with a
+    union-find accumulating the sizes, and a basin is retired as soon
+    as it does not reach the current row, since it can no longer grow.
+    """
+    def __init__(self):
+        self.parents = dict()
+        self.sizes = dict()
+        self.next_label = 0
+        self.largest = []  # Min-heap of the three largest basins
+
+        self.labels = None  # Labels of the previous row, -1 for 9s
+        self.window = []  # Previous and current rows
+        self.risk = 0
+
+    def find(self, label: int) -> int:
+        root = label
+        while self.parents[root] != root:
+            root = self.parents[root]
+        while self.parents[label] != root:
+            self.parents[label], label = root, self.parents[label]
+        return root
+
+    def union(self, label_1: int, label_2: int):
+        root_1, root_2 = self.find(label_1), self.find(label_2)
+        if root_1 != root_2:
+            self.parents[root_2] = root_1
+            self.sizes[root_1] += self.sizes.pop(root_2)
+
+    def retire(self, root: int):
+        size = self.sizes.pop(root)
+        if len(self.largest) < 3:
+            heapq.heappush(self.largest, size)
+        else:
+            heapq.heappushpop(self.largest, size)
+
+    def add_low_points(self, below: np.array):
+        """Risk of the middle row of the window, once its row below is known."""
+        above, current = self.window
+        padded = np.pad(current, 1, constant_values=10)
+        mask = (
+            (current < above) & (current < below)
+            & (current < padded[:-2]) & (current < padded[2:])
+        )
+        self.risk += (current[mask] + 1).sum()
+
+    def feed_row(self, row: np.array):
+        # Low points of the previous row
+        if not self.window:
+            self.window = [np.full(row.shape, 10), row]
+        else:
+            self.add_low_points(row)
+            self.window = [self.window[1], row]
+
+        # Runs of walkable cells of this row get a new label each
+        walkable = row != 9
+        starts = walkable & ~np.concatenate([[False], walkable[:-1]])
+        runs = np.cumsum(starts) - 1
+        labels = np.where(walkable, self.next_label + runs, -1)
+        run_sizes = np.bincount(runs[walkable], minlength=starts.sum())
+        for label, size in enumerate(run_sizes, start=self.next_label):
+            self.parents[label] = label
+            self.sizes[label] = int(size)
+        self.next_label += len(run_sizes)
+
+        # Merge with the basins of the row above
+        if self.labels is not None:
+            connected = walkable & (self.labels != -1)
+            pairs = set(zip(labels[connected].tolist(), self.labels[connected].tolist()))
+            for label, label_above in pairs:
+                self.union(label, label_above)
+
+        # Basins not reaching this row are done
+        roots = {label: self.find(label) for label in np.unique(labels[walkable]).tolist()}
+        alive = set(roots.values())
+        for root in list(self.sizes):
+            if root not in alive:
+                self.retire(root)
+
+        # Only the roots are needed from now on
+        self.parents = {root: root for root in alive}
+        self.labels = np.array([roots.get(l, -1) for l in labels.tolist()])
+
+    def finish(self) -> tuple[int, int]:
+        """Return the sum of the risks and the product of the three largest basins."""
+        if self.window:
+            self.add_low_points(np.full(self.window[1].shape, 10))
+            self.window = []
+
+        for root in list(self.sizes):
+            self.retire(root)
+
+        return int(self.risk), int(np.prod(self.largest))
+
+
+def solve_streaming(input_path: str) -> tuple[int, int]:
+    basins = StreamingBasins()
+    with open(input_path, 'r') as input_file:
+        for line in input_file:
+            line = line.replace('\n', '')
+            basins.feed_row(np.frombuffer(line.encode(), dtype=np.uint8) - ord('0'))
+
+    return basins.finish()
+
+
+def descent_basins(matrix: np.array) -> np.array:
+    """Label each cell with the flat index of the low point it flows to.
+
+    Each cell points to its lowest neighbour when it is strictly lower,
+    and to itself otherwise. The pointers are then resolved by pointer
+    doubling. Cells of height 9 are labelled -1.
+
+    This assumes every basin drains to a single low point: a flat area
+    without a lower neighbour makes its own basins.
+    """
+    width = matrix.shape[1]
+    padded = np.pad(matrix, 1, constant_values=10)
+    neighbours = np.stack([
+        padded[:-2, 1:-1],  # Up
+        padded[2:, 1:-1],  # Down
+        padded[1:-1, :-2],  # Left
+        padded[1:-1, 2:],  # Right
+    ])
+    offsets = np.array([-width, width, -1, 1])
+
+    indices = np.arange(matrix.size).reshape(matrix.shape)
+    lowest = neighbours.argmin(axis=0)
+    flows = neighbours.min(axis=0) < matrix
+    parents = np.where(flows, indices + offsets[lowest], indices)
+
+    roots = find_roots(parents.ravel()).reshape(matrix.shape)
+    return np.where(matrix != 9, roots, -1)
+
+
+def largest_basins_by_wall(matrix: np.array) -> list[list[int]]:
+    """Three largest basins for every wall height from 0 to 9.
+
+    For a wall height `h`, cells lower than `h` are walkable, so `h = 9`
+    is the rule of part 2. Cells are activated by increasing height and
+    merged with their active neighbours in a union-find, and the largest
+    basins are read after each height. Return the sizes for each wall
+    height, the largest first.
+    """
+    width = matrix.shape[1]
+    heights = matrix.ravel()
+    order = np.argsort(heights, kind='stable').tolist()
+    ends = np.searchsorted(heights, np.arange(1, 10), sorter=order).tolist()
+
+    parents = list(range(heights.size))
+    sizes = [1] * heights.size
+    active = [False] * heights.size
+    candidates = []  # Max-heap of (-size, root), lazily updated
+
+    def find(cell: int) -> int:
+        root = cell
+        while parents[root] != root:
+            root = parents[root]
+        while parents[cell] != root:
+            parents[cell], cell = root, parents[cell]
+        return root
+
+    largest = [[]]  # Nothing is walkable behind a wall of height 0
+    start = 0
+    for end in ends:
+        for cell in order[start:end]:
+            active[cell] = True
+            x = cell % width
+            neighbours = [cell - width, cell + width]
+            if x > 0:
+                neighbours.append(cell - 1)
+            if x < width - 1:
+                neighbours.append(cell + 1)
+
+            root = find(cell)
+            for n in neighbours:
+                if 0 <= n < heights.size and active[n]:
+                    other = find(n)
+                    if other != root:
+                        if sizes[other] > sizes[root]:
+                            root, other = other, root
+                        parents[other] = root
+                        sizes[root] += sizes[other]
+            heapq.heappush(candidates, (-sizes[root], root))
+        start = end
+
+        # Drop the outdated entries while reading the three largest
+        top = []
+        while candidates and len(top) < 3:
+            size, root = heapq.heappop(candidates)
+            if parents[root] == root and sizes[root] == -size:
+                top.append((size, root))
+        for entry in top:
+            heapq.heappush(candidates, entry)
+        largest.append([-size for size, _ in top])
+
+    return largest
+
+
 if __name__ == '__main__':
     print('Solution for day 9')
 